@@ -5,6 +5,7 @@ import threading
 import time
 import random
 import os
+import telemetry
 
 # Game settings
 WIDTH, HEIGHT = 800, 600
@@ -12,6 +13,7 @@ FPS = 60
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 GRAY = (100, 100, 100)
+TELEMETRY_DIR = "telemetry"
 
 class GameState(Enum):
     INTRO = 0
@@ -35,6 +37,7 @@ class VoiceControlledEscapeRoom:
         # Game state
         self.current_state = GameState.INTRO
         self.game_running = True
+        self.restart_requested = False
         self.time_limit = 1200  # 20 minutes in seconds
         self.start_time = None
         self.remaining_time = self.time_limit
@@ -47,6 +50,11 @@ class VoiceControlledEscapeRoom:
         self.recognized_text = ""
         self.is_listening = False
         
+        # Session telemetry
+        self.telemetry = telemetry.TelemetryWriter(TELEMETRY_DIR)
+        self.telemetry.enter_stage(self.current_state.value)
+        self.telemetry_state = self.current_state
+        
         # Game assets
         self.load_assets()
         
@@ -211,24 +219,38 @@ class VoiceControlledEscapeRoom:
     
     def voice_recognition_loop(self):
         """Voice recognition thread function"""
-        while self.is_listening:
+        # A restart starts a new voice thread, so stop if this one was replaced
+        while self.is_listening and self.voice_thread is threading.current_thread():
+            heard_at = None
+            recognized = False
             try:
                 with self.microphone as source:
                     self.add_message("Listening...")
                     audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=5)
                     
+                heard_at = time.monotonic()
+                stage = self.current_state.value
                 try:
                     self.recognized_text = self.recognizer.recognize_google(audio).lower()
+                    self.telemetry.recognition(stage, telemetry.OUTCOME_OK, (time.monotonic() - heard_at) * 1000)
+                    recognized = True
                     self.last_command = self.recognized_text
                     self.add_message(f"You said: {self.recognized_text}")
                     self.process_voice_command(self.recognized_text)
+                    self.telemetry.command(stage, (time.monotonic() - heard_at) * 1000)
                     
                 except sr.UnknownValueError:
+                    self.telemetry.recognition(stage, telemetry.OUTCOME_UNKNOWN, (time.monotonic() - heard_at) * 1000)
                     self.add_message("Sorry, I didn't understand that.")
                 except sr.RequestError:
+                    self.telemetry.recognition(stage, telemetry.OUTCOME_REQUEST, (time.monotonic() - heard_at) * 1000)
                     self.add_message("Could not request results. Check your network connection.")
                     
             except Exception as e:
+                # Silence and errors raised by a recognized command are not failed recognitions
+                if not recognized and not isinstance(e, sr.WaitTimeoutError):
+                    latency = (time.monotonic() - heard_at) * 1000 if heard_at else 0
+                    self.telemetry.recognition(self.current_state.value, telemetry.OUTCOME_ERROR, latency)
                 self.add_message(f"Error: {str(e)}")
                 time.sleep(1)
                 
@@ -473,6 +495,12 @@ class VoiceControlledEscapeRoom:
             if self.remaining_time <= 0 and self.current_state not in [GameState.WIN, GameState.FAIL]:
                 self.game_over()
     
+    def update_telemetry(self):
+        """Record stage transitions made by either thread"""
+        if self.current_state != self.telemetry_state:
+            self.telemetry_state = self.current_state
+            self.telemetry.enter_stage(self.current_state.value)
+    
     def win_game(self):
         """Player has won the game"""
         self.current_state = GameState.WIN
@@ -480,6 +508,7 @@ class VoiceControlledEscapeRoom:
     
     def game_over(self):
         """Player has lost the game"""
+        self.telemetry.timeout(self.current_state.value, time.time() - self.start_time)
         self.current_state = GameState.FAIL
         self.add_message("Time's up! You failed to escape in time.")
     
@@ -534,8 +563,16 @@ class VoiceControlledEscapeRoom:
     
     def reset_game(self):
         """Reset game state and start over"""
+        # Voice commands run on the voice thread, so the main loop does the work
+        self.restart_requested = True
+
+    def restart_game(self):
+        """Reinitialize everything from the main loop and keep playing"""
+        self.stop_listening()
+        self.telemetry.end_stage()
+        self.telemetry.close()
         self.__init__()  # reinitialize everything
-        self.run()
+        self.start_listening()
 
     def draw_game_screen(self):
         """Draw the game screen for the current stage"""
@@ -633,7 +670,7 @@ class VoiceControlledEscapeRoom:
             self.start_listening()
             
             while self.game_running:
-                self.clock.tick(FPS)
+                self.telemetry.frame(self.clock.tick(FPS))
                 
                 # Process events
                 for event in pygame.event.get():
@@ -651,6 +688,10 @@ class VoiceControlledEscapeRoom:
                 
                 # Update game state
                 self.update_time()
+                self.update_telemetry()
+                if self.restart_requested:
+                    self.restart_game()
+                    continue
                 
                 # Draw everything
                 self.draw()
@@ -660,6 +701,8 @@ class VoiceControlledEscapeRoom:
         finally:
             # Clean up
             self.stop_listening()
+            self.telemetry.end_stage()
+            self.telemetry.close()
             pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,342 @@
+"""Session telemetry for Whisper Your Way Out.
+
+The game appends fixed-size binary records to memory-mapped log files that
+rotate once they are full. Recording never touches the disk on the caller's
+thread: records are queued and a background thread copies them into the
+current file.
+
+Running this module analyzes a set of session logs:
+
+    python telemetry.py telemetry/
+"""
+import argparse
+import collections
+import glob
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+# File layout: a 16-byte header followed by fixed-size records
+MAGIC = b"WYWT"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")   # magic, version, record size, record count, dropped records
+RECORD = struct.Struct("<IBBHf")    # t_ms, kind, stage, code, value
+RECORDS_PER_FILE = 8192
+FILE_PATTERN = "session-{stamp}-{pid}-{seq:03d}.wyt"
+
+# Record kinds
+KIND_STAGE = 1        # stage = stage left, code = stage entered, value = seconds spent
+KIND_RECOGNITION = 2  # code = outcome, value = recognition latency in ms
+KIND_COMMAND = 3      # value = ms from end of speech until the command was handled
+KIND_FRAME = 4        # code = percentile (50, 95, 99, 100), value = frame time in ms
+KIND_TIMEOUT = 5      # value = seconds since the game started
+
+# Recognition outcomes
+OUTCOME_OK = 0
+OUTCOME_UNKNOWN = 1   # "Sorry, I didn't understand that."
+OUTCOME_REQUEST = 2   # Speech service unreachable
+OUTCOME_ERROR = 3     # Listening or recognition failed; value is 0 if nothing was heard
+
+FRAME_PERCENTILES = (50, 95, 99, 100)
+
+# Matches the GameState enum in escape1.py
+STAGE_NAMES = ("Intro", "Library", "Laboratory", "Office", "Vault", "Final", "Win", "Fail")
+
+
+class TelemetryWriter:
+    def __init__(self, directory, records_per_file=RECORDS_PER_FILE, queue_size=4096):
+        self.directory = directory
+        self.records_per_file = records_per_file
+        self.session_start = time.monotonic()
+        self.stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.sequence = 0
+        self.enabled = True
+
+        # Mapped log file, only touched by the writer thread
+        self.file = None
+        self.map = None
+        self.count = 0
+        self.dropped_before_file = 0
+
+        # Frame times for the current stage, only touched by the main thread
+        self.stage = None
+        self.stage_start = self.session_start
+        self.frame_times = []
+
+        # Pending records; a full queue drops the oldest instead of blocking
+        self.queue = collections.deque(maxlen=queue_size)
+        self.dropped = 0
+        self.wakeup = threading.Event()
+        self.running = True
+        self.thread = None
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError as e:
+            print(f"Telemetry disabled: {e}")
+            self.enabled = False
+            return
+
+        self.thread = threading.Thread(target=self.writer_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def elapsed_ms(self):
+        return int((time.monotonic() - self.session_start) * 1000)
+
+    def record(self, kind, stage, code=0, value=0.0):
+        """Queue a record for the writer thread"""
+        if self.enabled:
+            self.enqueue((self.elapsed_ms(), kind, stage, code, value))
+
+    def enqueue(self, item):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(item)
+
+    def frame(self, frame_ms):
+        """Note how long the last frame took"""
+        self.frame_times.append(frame_ms)
+
+    def enter_stage(self, stage):
+        """Close out the current stage and start timing a new one"""
+        self.end_stage(stage)
+        self.stage = stage
+        self.stage_start = time.monotonic()
+        self.frame_times = []
+
+    def end_stage(self, next_stage=None):
+        """Record time and frame percentiles for the current stage"""
+        if self.stage is None:
+            return
+        if next_stage is None:
+            next_stage = self.stage
+        self.record(KIND_STAGE, self.stage, next_stage, time.monotonic() - self.stage_start)
+        if self.enabled and self.frame_times:
+            # Percentiles are computed on the writer thread
+            self.enqueue((self.elapsed_ms(), KIND_FRAME, self.stage, 0, self.frame_times))
+        self.frame_times = []
+
+    def recognition(self, stage, outcome, latency_ms):
+        self.record(KIND_RECOGNITION, stage, outcome, latency_ms)
+
+    def command(self, stage, latency_ms):
+        self.record(KIND_COMMAND, stage, 0, latency_ms)
+
+    def timeout(self, stage, elapsed):
+        self.record(KIND_TIMEOUT, stage, 0, elapsed)
+
+    def close(self):
+        """Stop the writer thread once it has flushed everything still queued
+
+        Frame state is left alone so this is safe from any thread; call
+        end_stage() from the main thread first to record the last stage.
+        Records arriving after this are refused.
+        """
+        if not self.running:
+            return
+        self.running = False
+        self.enabled = False
+        if self.thread is None:
+            return
+        self.wakeup.set()
+        self.thread.join(timeout=1)
+        if self.thread.is_alive():
+            print(f"Telemetry: writer still busy, {len(self.queue)} queued records may be lost")
+
+    def writer_loop(self):
+        """Writer thread function"""
+        while self.running:
+            self.wakeup.wait(0.25)
+            self.wakeup.clear()
+            self.drain()
+        # Final flush happens here so the file is only ever touched by this thread
+        self.drain()
+        self.close_file()
+
+    def drain(self):
+        wrote = False
+        try:
+            while self.queue:
+                t_ms, kind, stage, code, value = self.queue.popleft()
+                if kind == KIND_FRAME:
+                    times = sorted(value)
+                    for percentile in FRAME_PERCENTILES:
+                        # Nearest-rank percentile
+                        index = max(0, math.ceil(len(times) * percentile / 100) - 1)
+                        self.write(t_ms, KIND_FRAME, stage, percentile, times[index])
+                else:
+                    self.write(t_ms, kind, stage, code, value)
+                wrote = True
+            if wrote:
+                self.map.flush()
+        except (OSError, ValueError) as e:
+            print(f"Telemetry disabled: {e}")
+            self.enabled = False
+            self.queue.clear()
+
+    def write(self, t_ms, kind, stage, code, value):
+        if self.map is None or self.count == self.records_per_file:
+            self.open_file()
+        RECORD.pack_into(self.map, HEADER.size + self.count * RECORD.size,
+                         t_ms, kind, stage, code, value)
+        self.count += 1
+        # Bump the count last so a crash never exposes a half-written record
+        self.write_header()
+
+    def write_header(self):
+        dropped = self.dropped - self.dropped_before_file
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, RECORD.size, self.count, dropped)
+
+    def open_file(self):
+        self.close_file()
+        name = FILE_PATTERN.format(stamp=self.stamp, pid=os.getpid(), seq=self.sequence)
+        self.sequence += 1
+        self.file = open(os.path.join(self.directory, name), "w+b")
+        self.file.truncate(HEADER.size + self.records_per_file * RECORD.size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.count = 0
+        self.write_header()
+
+    def close_file(self):
+        if self.map is not None:
+            # Count records dropped since the last write as well
+            self.write_header()
+            self.dropped_before_file = self.dropped
+            self.map.flush()
+            self.map.close()
+            # Trim unused preallocated space
+            self.file.truncate(HEADER.size + self.count * RECORD.size)
+            self.file.close()
+            self.map = None
+            self.file = None
+
+
+def load_records(paths):
+    """Read every record from the given log files into one structured array
+
+    Returns the records and the number of records the writers had to drop.
+    """
+    import numpy as np
+
+    dtype = np.dtype([("t_ms", "<u4"), ("kind", "u1"), ("stage", "u1"),
+                      ("code", "<u2"), ("value", "<f4")])
+    assert dtype.itemsize == RECORD.size
+
+    chunks = []
+    dropped = 0
+    for path in paths:
+        try:
+            f = open(path, "rb")
+        except OSError as e:
+            print(f"Skipping {path}: {e.strerror}")
+            continue
+        with f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                print(f"Skipping {path}: not a version {VERSION} telemetry log")
+                continue
+            magic, version, record_size, count, file_dropped = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                print(f"Skipping {path}: not a version {VERSION} telemetry log")
+                continue
+            chunks.append(np.fromfile(f, dtype=dtype, count=count))
+            dropped += file_dropped
+
+    if not chunks:
+        return np.empty(0, dtype=dtype), dropped
+    return np.concatenate(chunks), dropped
+
+
+def find_logs(paths):
+    logs = []
+    for path in paths:
+        if os.path.isdir(path):
+            logs.extend(glob.glob(os.path.join(path, "**", "*.wyt"), recursive=True))
+        elif os.path.isfile(path):
+            logs.append(path)
+        else:
+            print(f"Skipping {path}: no such file or directory")
+    return sorted(logs)
+
+
+def print_histogram(values, bins, unit):
+    import numpy as np
+
+    counts, edges = np.histogram(values, bins=bins)
+    peak = max(1, counts.max())
+    for count, low, high in zip(counts, edges[:-1], edges[1:]):
+        bar = "#" * int(round(40 * count / peak))
+        print(f"    {low:7.1f}-{high:7.1f} {unit:<2} {count:7d} {bar}".rstrip())
+
+
+def analyze(records, dropped=0, bins=10):
+    """Print per-stage statistics for a set of records"""
+    import numpy as np
+
+    kinds = records["kind"]
+    stages = records["stage"]
+    values = records["value"]
+    codes = records["code"]
+
+    print(f"{len(records)} records")
+    if dropped:
+        print(f"Warning: {dropped} records were dropped while recording, some sessions are incomplete")
+    for stage, name in enumerate(STAGE_NAMES):
+        in_stage = stages == stage
+        visits = values[in_stage & (kinds == KIND_STAGE)]
+        recognitions = codes[in_stage & (kinds == KIND_RECOGNITION)]
+        # Errors with nothing heard have no latency to report
+        recognition_ms = values[in_stage & (kinds == KIND_RECOGNITION) & (values > 0)]
+        command_ms = values[in_stage & (kinds == KIND_COMMAND)]
+        timeouts = np.count_nonzero(in_stage & (kinds == KIND_TIMEOUT))
+        if not (len(visits) or len(recognitions) or len(command_ms) or timeouts):
+            continue
+
+        print(f"\nStage {stage}: {name}")
+        print(f"  visits: {len(visits)}  timeouts: {timeouts}")
+        if len(visits):
+            print(f"  time in stage (median {np.median(visits):.1f}s):")
+            print_histogram(visits, bins, "s")
+
+        if len(recognitions):
+            outcomes = np.bincount(recognitions, minlength=OUTCOME_ERROR + 1)
+            total = len(recognitions)
+            print(f"  recognitions: {total}  not understood: {100 * outcomes[OUTCOME_UNKNOWN] / total:.1f}%"
+                  f"  request errors: {100 * outcomes[OUTCOME_REQUEST] / total:.1f}%"
+                  f"  other errors: {100 * outcomes[OUTCOME_ERROR] / total:.1f}%")
+            if len(recognition_ms):
+                p50, p95 = np.percentile(recognition_ms, [50, 95])
+                print(f"  recognition latency p50 {p50:.0f}ms  p95 {p95:.0f}ms")
+
+        if len(command_ms):
+            p50, p95 = np.percentile(command_ms, [50, 95])
+            print(f"  command latency p50 {p50:.0f}ms  p95 {p95:.0f}ms:")
+            print_histogram(command_ms, bins, "ms")
+
+        frames = in_stage & (kinds == KIND_FRAME)
+        if np.any(frames):
+            summary = "  ".join(
+                f"p{percentile} {np.median(values[frames & (codes == percentile)]):.1f}ms"
+                for percentile in FRAME_PERCENTILES if percentile != 100)
+            worst = values[frames & (codes == 100)].max()
+            print(f"  frame time (median across visits) {summary}  worst {worst:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize Whisper Your Way Out telemetry logs.")
+    parser.add_argument("paths", nargs="+", help="log files or directories containing *.wyt logs")
+    parser.add_argument("--bins", type=int, default=10, help="number of histogram bins")
+    args = parser.parse_args()
+
+    logs = find_logs(args.paths)
+    print(f"Reading {len(logs)} log files")
+    records, dropped = load_records(logs)
+    analyze(records, dropped, bins=args.bins)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+import telemetry
+
+np = pytest.importorskip("numpy")
+
+
+def write_session(directory):
+    writer = telemetry.TelemetryWriter(directory, records_per_file=4)
+    writer.enter_stage(1)
+    for frame_ms in range(1, 101):
+        writer.frame(frame_ms)
+    writer.recognition(1, telemetry.OUTCOME_OK, 200.0)
+    writer.recognition(1, telemetry.OUTCOME_UNKNOWN, 400.0)
+    writer.recognition(1, telemetry.OUTCOME_ERROR, 0)
+    writer.command(1, 250.0)
+    writer.enter_stage(2)
+    writer.timeout(2, 1200.0)
+    writer.end_stage()
+    writer.close()
+
+
+def test_round_trip_rotates_and_trims(tmp_path):
+    write_session(str(tmp_path))
+
+    # 4 recognition/command + 2 stage + 4 frame + 1 timeout records
+    logs = telemetry.find_logs([str(tmp_path)])
+    assert len(logs) == 3
+    sizes = [os.path.getsize(path) for path in logs]
+    assert sizes == [telemetry.HEADER.size + n * telemetry.RECORD.size for n in (4, 4, 3)]
+
+    records, dropped = telemetry.load_records(logs)
+    assert len(records) == 11
+    assert dropped == 0
+    assert np.all(np.diff(records["t_ms"].astype(np.int64)) >= 0)
+
+    stages = records[records["kind"] == telemetry.KIND_STAGE]
+    assert list(zip(stages["stage"], stages["code"])) == [(1, 2), (2, 2)]
+
+    frames = records[records["kind"] == telemetry.KIND_FRAME]
+    assert list(frames["stage"]) == [1] * 4
+    assert list(frames["code"]) == list(telemetry.FRAME_PERCENTILES)
+    assert list(frames["value"]) == [50, 95, 99, 100]
+
+    timeouts = records[records["kind"] == telemetry.KIND_TIMEOUT]
+    assert list(timeouts["stage"]) == [2]
+    assert timeouts["value"][0] == 1200.0
+
+
+def test_analyze_ignores_latency_of_unheard_errors(tmp_path, capsys):
+    write_session(str(tmp_path))
+    records, _ = telemetry.load_records(telemetry.find_logs([str(tmp_path)]))
+    capsys.readouterr()
+
+    telemetry.analyze(records, bins=2)
+    out = capsys.readouterr().out
+    assert "recognitions: 3  not understood: 33.3%" in out
+    assert "recognition latency p50 300ms" in out
+    assert "command latency p50 250ms" in out
+    assert "Stage 2: Laboratory" in out
+
+
+def test_missing_and_foreign_logs_are_skipped(tmp_path, capsys):
+    foreign = tmp_path / "foreign.wyt"
+    foreign.write_bytes(b"x" * 32)
+    missing = str(tmp_path / "missing.wyt")
+
+    logs = telemetry.find_logs([str(foreign), missing])
+    assert logs == [str(foreign)]
+    records, dropped = telemetry.load_records(logs + [missing])
+    assert len(records) == 0 and dropped == 0
+    out = capsys.readouterr().out
+    assert "Skipping " + missing in out
+    assert "not a version 1 telemetry log" in out
+
+
+def test_dropped_records_are_counted(tmp_path, capsys):
+    writer = telemetry.TelemetryWriter(str(tmp_path), records_per_file=4, queue_size=2)
+    for i in range(20):
+        writer.command(1, float(i))
+    writer.close()
+    writer.command(1, 99.0)
+
+    records, dropped = telemetry.load_records(telemetry.find_logs([str(tmp_path)]))
+    assert dropped == writer.dropped
+    assert len(records) + dropped == 20
+
+    telemetry.analyze(records, dropped)
+    if dropped:
+        assert f"Warning: {dropped} records were dropped" in capsys.readouterr().out
+
+
+def test_short_header_is_reported(tmp_path, capsys):
+    short = tmp_path / "short.wyt"
+    short.write_bytes(b"WYWT")
+
+    records, _ = telemetry.load_records([str(short)])
+    assert len(records) == 0
+    assert f"Skipping {short}: not a version 1 telemetry log" in capsys.readouterr().out